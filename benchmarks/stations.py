@@ -0,0 +1,53 @@
+"""
+compares parse time and retained memory of the station parser against keeping a full
+`html.parser` soup alive (which is what the cached stations used to pin)
+
+usage: python -m benchmarks.stations [page.html]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+import httpx
+from bs4 import BeautifulSoup
+
+from bot.actions.stations import PAGE_URL, parse_stations
+
+
+def measure(name: str, f, repeat: int = 5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    result = f()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    print(
+        f"{name:<32} {min(timings) * 1000:8.1f}ms {retained / 1024 / 1024:8.2f}MiB retained"
+        f" {peak / 1024 / 1024:8.2f}MiB peak"
+    )
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8") as f:
+            html = f.read()
+    else:
+        html = httpx.get(PAGE_URL, follow_redirects=True).text
+
+    measure("full soup (html.parser)", lambda: BeautifulSoup(html, "html.parser"))
+    measure("parse_stations (html.parser)", lambda: parse_stations(html, parser="html.parser"))
+    measure("parse_stations (lxml)", lambda: parse_stations(html))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,25 @@
-import inspect
+import asyncio
+import functools
 
 import telegram.constants
 from telegram import Update
-from telegram.ext import ContextTypes
+from telegram.ext import Application, ContextTypes
 
 from . import actions
-from .actions import MessageType
+from .actions import MessageType, http
+from .actions.cities import get_city_table
+from .actions.executor import run_blocking, shutdown_executor
 from .logger import create_logger
 
+# handlers run for every update, so they share one logger instead of looking up their own
+log = create_logger(__name__)
 
-def send_telegram_error_message(message: str, *, _: Update = None):
-    log = create_logger(inspect.currentframe().f_code.co_name)
 
+def send_telegram_error_message(message: str, *, _: Update = None):
     log.error(message)
 
 
 async def random_action(update: Update, _: ContextTypes.DEFAULT_TYPE):
-    log = create_logger(inspect.currentframe().f_code.co_name)
-
     text = (
         update.effective_message.text if update.effective_message.text else update.effective_message.caption
     )
@@ -27,11 +29,33 @@ async def random_action(update: Update, _: ContextTypes.DEFAULT_TYPE):
     command = update.effective_message.text.replace("/", "")
     command = command.split("@", maxsplit=1)[0]
     action = actions.actions.find(command)
-    if not action:
+    # explicitly requested actions always answer themselves, random picks may be hedged with a faster one
+    explicit = action is not None
+    run = action
+    if not explicit:
         action = actions.actions.random()
+        run = functools.partial(actions.actions.run_hedged, action)
+
+    log.debug("chose %s", action.name())
+    timed_out = False
+    try:
+        message = await run()
+    except asyncio.TimeoutError:
+        log.warning("%s timed out", action.name())
+        timed_out = True
+        message = None
+
+    # explicitly requested actions that failed send their error, anything else is answered by a fallback
+    if (timed_out or not (explicit or actions.is_usable(message))) and (
+        fallback := actions.actions.fallback(exclude=action)
+    ):
+        log.warning("%s has no message, falling back to %s", action.name(), fallback.name())
+        message = await fallback()
+
+    if message is None:
+        log.error("%s has no message and there is no fallback", action.name())
+        return
 
-    log.debug(f"chose {action.name()}")
-    message = action()
     return await message.send(update)
 
 
@@ -40,3 +64,17 @@ async def weights(update: Update, _: ContextTypes.DEFAULT_TYPE):
     return await update.effective_message.reply_text(
         message, parse_mode=telegram.constants.ParseMode.MARKDOWN_V2
     )
+
+
+async def startup(_: Application):
+    await http.start_client()
+    # building the city table takes about a second, so it's done once before the first update arrives
+    await run_blocking(get_city_table)
+    actions.actions.start_prefetching()
+
+
+async def shutdown(_: Application):
+    await actions.actions.stop_prefetching()
+    await http.stop_client()
+    actions.file_ids.save()
+    shutdown_executor()
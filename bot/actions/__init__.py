@@ -1,3 +1,4 @@
+import asyncio
 import dataclasses
 import inspect
 import os
@@ -5,23 +6,37 @@ import random
 import time
 from abc import abstractmethod
 from enum import Enum
-from typing import List, Callable, Optional
+from functools import cache
+from typing import List, Callable, Optional, Awaitable, Self, Dict, Iterable
 
-import geonamescache
-import requests
 import telegram.constants
+import telegram.error
 from imdb import Cinemagoer
 from telegram import Update
 from telegram.ext import ContextTypes
 
 from .apininjas import ApiNinjas
+from .cities import get_city_table
+from .executor import run_blocking
+from .feed import BatchFeed
+from .fileids import file_ids
+from .health import ActionHealth
 from .nasaapi import NasaApi
+from .pool import MessagePool, default_pool_size
+from .refresh import RefreshingValue
+from .sampler import AliasSampler
+from .spacex import random_launch_photo
 from .stations import get_stations
 from .thecatapi import TheCatApi
-from .utils import escape_markdown, get_json_from_url, RequestError
+from .trie import PrefixTrie
+from .utils import escape_markdown, escape_markdown_many, get_json_from_url, RequestError
 from ..logger import create_logger
 
 
+def default_action_timeout() -> float:
+    return float(os.getenv("ACTION_TIMEOUT") or 15)
+
+
 class MessageType(Enum):
     Text = "text"
     Photo = "photo"
@@ -39,6 +54,7 @@ class Message:
 @dataclasses.dataclass
 class TextMessage(Message):
     async def send(self, update: Update):
+        # pacing between the chunks is done by the bot's rate limiter (see `bot.ratelimit`)
         messages = self.split()
         first = True
         for message in messages:
@@ -46,7 +62,6 @@ class TextMessage(Message):
                 message, parse_mode=self.parse_mode, disable_notification=not first
             )
             first = False
-            time.sleep(1)
 
     type = MessageType.Text
     text: str
@@ -82,6 +97,30 @@ class TextMessage(Message):
         return [self.join_with.join(entry) for entry in messages]
 
 
+@dataclasses.dataclass
+class ChunkedTextMessage(TextMessage):
+    """
+    a text that has already been escaped and split into messages
+    """
+
+    text: str = ""
+    chunks: tuple[str, ...] = ()
+
+    def split(self) -> List[str]:
+        return list(self.chunks)
+
+
+@dataclasses.dataclass
+class ErrorMessage(TextMessage):
+    """
+    a message describing a failed upstream request, never prefetched
+    """
+
+    @classmethod
+    def from_error(cls, e: Exception) -> Self:
+        return cls(escape_markdown("\n".join(str(arg) for arg in e.args)))
+
+
 @dataclasses.dataclass
 class PhotoMessage(Message):
     type = MessageType.Photo
@@ -89,66 +128,288 @@ class PhotoMessage(Message):
     caption: str = ""
 
     async def send(self, update: Update):
-        await update.effective_message.reply_photo(
+        # photos that have been sent before are referenced by their file_id, telegram doesn't download them again
+        if file_id := file_ids.get(self.url):
+            try:
+                await update.effective_message.reply_photo(
+                    file_id,
+                    caption=self.caption[:1024],
+                    parse_mode=self.parse_mode,
+                )
+                return
+            except telegram.error.BadRequest:
+                file_ids.remove(self.url)
+
+        sent = await update.effective_message.reply_photo(
             self.url,
             caption=self.caption[:1024],
             parse_mode=self.parse_mode,
         )
+        if sent.photo:
+            file_ids.put(self.url, sent.photo[-1].file_id)
 
 
 def function_to_md(f: Callable):
     return escape_markdown(f.__name__.replace("action_", ""))
 
 
+def is_usable(message: Optional[Message]) -> bool:
+    return message is not None and not isinstance(message, ErrorMessage)
+
+
 @dataclasses.dataclass
 class Action:
-    _f: Callable[[], str]
+    _f: Callable[[], Optional[Message] | Awaitable[Optional[Message]]]
     weight: float
     type: MessageType
+    prefetch: bool = False
+    # seconds until a run is abandoned, `None` uses `ACTION_TIMEOUT`
+    timeout: Optional[float] = None
+    # answers from memory without blocking, so it runs on the event loop without a timeout
+    local: bool = False
+    # a local action answering with a single message, used when another action fails, times out or is slow
+    fallback: bool = False
+    pool: Optional[MessagePool[Message]] = dataclasses.field(default=None, repr=False)
+    health: ActionHealth = dataclasses.field(default_factory=ActionHealth, repr=False)
+
+    async def __call__(self, *args, **kwargs) -> Optional[Message]:
+        if self.pool:
+            message = self.pool.get_nowait()
+            if message:
+                return message
+
+        return await self.run()
+
+    async def _call(self) -> Optional[Message]:
+        if self.local or inspect.iscoroutinefunction(self._f):
+            result = self._f()
+        else:
+            # synchronous actions may block on upstreams or parsing, so they don't run on the event loop
+            result = run_blocking(self._f)
 
-    def __call__(self, *args, **kwargs):
-        return self._f()
+        if inspect.isawaitable(result):
+            result = await result
+
+        return result
+
+    async def run(self) -> Optional[Message]:
+        """
+        raises `asyncio.TimeoutError` if the action doesn't finish within its timeout
+        """
+        start = time.monotonic()
+        result = None
+        cancelled = False
+        try:
+            if self.local:
+                result = await self._call()
+            else:
+                timeout = self.timeout if self.timeout is not None else default_action_timeout()
+                result = await asyncio.wait_for(self._call(), timeout)
+        except asyncio.CancelledError:
+            # e.g. lost a hedged race, which says nothing about the action's health
+            cancelled = True
+            raise
+        finally:
+            if not cancelled:
+                self.health.record(time.monotonic() - start, is_usable(result))
+
+        return result
+
+    def is_ready(self) -> bool:
+        """
+        whether calling the action answers right away with a single message (a fallback or its prefetched pool)
+        """
+        return self.fallback or bool(self.pool)
+
+    def hedge_after(self) -> Optional[float]:
+        """
+        seconds after which a random pick of this action is raced against a ready one (its p95 latency),
+        `None` until enough latencies have been observed
+        """
+        return self.health.percentile(0.95)
+
+    def effective_weight(self) -> float:
+        return self.weight * self.health.factor()
+
+    async def _prefetch_one(self) -> Optional[Message]:
+        message = await self.run()
+        if isinstance(message, ErrorMessage):
+            return None
+
+        return message
 
     def name(self):
         return self._f.__name__
 
     def __str__(self):
-        return rf"/{function_to_md(self._f)}: {self.weight} \({self.type.value}\)"
+        weight = f"{self.weight}"
+        if self.health.is_suspended():
+            weight += " (suspended)"
+        elif (effective_weight := round(self.effective_weight(), 1)) != self.weight:
+            weight += f" → {effective_weight:.1f}"
+
+        return rf"/{function_to_md(self._f)}: {escape_markdown(weight)} \({self.type.value}\)"
 
 
 class TheDecider:
     actions: List[Action] = None
+    # shorter prefixes are too likely to be typed by accident, e.g. `/b` would flood the chat with the bee movie
+    min_prefix_length: int = 4
+    # commands asking for nothing in particular, these (and their prefixes) always get a random action
+    generic_commands: frozenset[str] = frozenset({"random"})
 
     def __init__(self):
         self.actions = []
+        # function names, command names and aliases (all lowercase) to their action
+        self._index: Dict[str, Action] = {}
+        # command names and aliases to the function name of their action
+        self._prefixes = PrefixTrie()
+        self._sampler: Optional[AliasSampler[Action]] = None
+        # the sampler has to be rebuilt once the earliest suspension ends
+        self._sampler_expires_at = float("inf")
 
     def contains(self, function_name: str):
-        return any(action.name() == function_name for action in self.actions)
-
-    def add(self, weight: float = 10, message_type: MessageType = MessageType.Text):
+        return function_name.lower() in self._index
+
+    def add(
+        self,
+        weight: float = 10,
+        message_type: MessageType = MessageType.Text,
+        prefetch: bool = False,
+        aliases: Iterable[str] = (),
+        timeout: float = None,
+        local: bool = False,
+        fallback: bool = False,
+    ):
         def wrapper(f: Callable[[Update, ContextTypes], str]):
-            if self.contains(f.__name__):
-                raise Exception(f"`{f.__name__}` is defined multiple times")
-
-            self.actions.append(Action(f, weight, message_type))
+            action = Action(f, weight, message_type, prefetch, timeout, local, fallback)
+            action.health.on_change = self.reweight
+            name = action.name().lower()
+            commands = {name.removeprefix("action_"), *(alias.lower() for alias in aliases)}
+            for key in {name, *commands}:
+                if self.contains(key):
+                    raise Exception(f"`{key}` (`{f.__name__}`) is defined multiple times")
+
+            self.actions.append(action)
+            self.reweight()
+            for key in {name, *commands}:
+                self._index[key] = action
+            for command in commands:
+                self._prefixes.insert(command, name)
 
             return f
 
         return wrapper
 
     def find(self, name: str) -> Optional[Action]:
-        for action in self.actions:
-            action_name = action.name()
-            if action_name == name.lower() or action_name == f"action_{name}".lower():
-                return action
+        """
+        resolves a function name, command name or alias, or an unambiguous prefix of a command name or alias
+        that is at least `min_prefix_length` long and not part of a generic command
+        """
+        name = name.lower()
+        if action := self._index.get(name):
+            return action
+
+        if len(name) < self.min_prefix_length or any(word.startswith(name) for word in self.generic_commands):
+            return None
+
+        if target := self._prefixes.unique(name):
+            return self._index[target]
 
         return None
 
+    def reweight(self):
+        """
+        has to be called after changing the weight of an action, changes in health trigger it automatically
+        """
+        self._sampler = None
+
+    def sampler(self) -> AliasSampler[Action]:
+        now = time.monotonic()
+        if self._sampler is None or now >= self._sampler_expires_at:
+            weights = [action.effective_weight() for action in self.actions]
+            if not any(weights):
+                # everything is unhealthy, there is no point in favoring any of them
+                weights = [action.weight for action in self.actions]
+
+            self._sampler = AliasSampler(self.actions, weights)
+            self._sampler_expires_at = min(
+                (action.health.suspended_until for action in self.actions if action.health.is_suspended(now)),
+                default=float("inf"),
+            )
+
+        return self._sampler
+
     def random(self) -> Action:
-        return random.choices(
-            [x for x in self.actions],
-            weights=[x.weight for x in self.actions],
-        )[0]
+        return self.sampler().sample()
+
+    def random_many(self, k: int) -> List[Action]:
+        return self.sampler().sample_many(k)
+
+    def fallback(self, exclude: Action = None) -> Optional[Action]:
+        """
+        a random fallback action (other than `exclude`), these answer immediately with a single message
+        """
+        candidates = [action for action in self.actions if action.fallback and action is not exclude]
+        if not candidates:
+            return None
+
+        return random.choices(candidates, [action.weight for action in candidates])[0]
+
+    def hedge(self, exclude: Action) -> Optional[Action]:
+        """
+        a random healthy action other than `exclude` that answers right away, or a fallback action
+        """
+        candidates = [action for action in self.actions if action is not exclude and action.is_ready()]
+        weights = [action.effective_weight() for action in candidates]
+        if not any(weights):
+            return self.fallback(exclude)
+
+        return random.choices(candidates, weights)[0]
+
+    async def run_hedged(self, action: Action) -> Optional[Message]:
+        """
+        runs `action`, and if it hasn't answered within its usual latency also a ready action.
+        the first usable message wins and the other run is cancelled. if neither is usable the
+        outcome of `action` is returned (or raised)
+        """
+        log = create_logger(inspect.currentframe().f_code.co_name)
+
+        delay = action.hedge_after()
+        if delay is None or action.local or action.is_ready():
+            return await action()
+
+        primary = asyncio.ensure_future(action())
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done and (hedge := self.hedge(action)):
+                log.debug("%s is slower than %.2fs, hedging with %s", action.name(), delay, hedge.name())
+                pending.add(asyncio.ensure_future(hedge()))
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and is_usable(task.result()):
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return primary.result()
+
+    def start_prefetching(self, size: int = None):
+        size = size or default_pool_size()
+        for action in self.actions:
+            if action.prefetch and not action.pool:
+                action.pool = MessagePool(action.name(), action._prefetch_one, size)
+                action.pool.start()
+
+    async def stop_prefetching(self):
+        for action in self.actions:
+            if action.pool:
+                await action.pool.stop()
+                action.pool = None
 
     def __str__(self):
         return "\n".join([str(action) for action in self.actions])
@@ -157,24 +418,24 @@ class TheDecider:
 actions = TheDecider()
 
 
-@actions.add(weight=10)
+@actions.add(weight=10, local=True, fallback=True)
 def action_random_phrase():
     return TextMessage(
         escape_markdown(random.choice(["Hello World!", "This command is not supported", "I don't like you"]))
     )
 
 
-@actions.add(weight=10)
-def action_official_joke_api():
+@actions.add(weight=10, prefetch=True, aliases=["joke"])
+async def action_official_joke_api():
     log = create_logger(inspect.currentframe().f_code.co_name)
 
     # https://github.com/15Dkatz/official_joke_api
     url = "https://official-joke-api.appspot.com/jokes/random"
     try:
-        joke = get_json_from_url(url)
-    except RequestError:
+        joke = await get_json_from_url(url)
+    except RequestError as e:
         log.exception("fail", exc_info=True)
-        return
+        return ErrorMessage.from_error(e)
 
     setup = escape_markdown(joke["setup"])
     punchline = escape_markdown(joke["punchline"])
@@ -185,134 +446,108 @@ def action_official_joke_api():
     )
 
 
-@actions.add(weight=5)
-def action_apininjas_facts():
-    api = ApiNinjas(
-        "facts",
-        {
-            "limit": 1,
-        },
-    )
+# text endpoints are fetched in batches of the maximum `limit` api ninjas allows and handed out one by one
+api_ninjas_facts = BatchFeed("facts", ApiNinjas("facts", {"limit": 30}).get)
 
-    message = ""
+
+@actions.add(weight=5, prefetch=True, aliases=["fact", "facts"], timeout=ApiNinjas.deadline())
+async def action_apininjas_facts():
     try:
-        res = api.get()
+        fact = await api_ninjas_facts.next()
     except RequestError as e:
-        message = escape_markdown("\n".join(e.args))
-    if res:
-        message = escape_markdown(res[0]["fact"])
+        return ErrorMessage.from_error(e)
 
-    return TextMessage(message)
+    return TextMessage(escape_markdown(fact["fact"]))
 
 
-@actions.add(weight=7)
-def action_apininjas_chuck_norris():
+@actions.add(weight=7, prefetch=True, aliases=["chucknorris"], timeout=ApiNinjas.deadline())
+async def action_apininjas_chuck_norris():
     api = ApiNinjas("chucknorris")
 
     message = ""
     try:
-        res = api.get()
+        res = await api.get()
     except RequestError as e:
-        message = escape_markdown("\n".join(e.args))
+        return ErrorMessage.from_error(e)
     if res:
         message = escape_markdown(res["joke"])
 
     return TextMessage(message)
 
 
-@actions.add(weight=10)
-def action_apininjas_dad_joke():
-    api = ApiNinjas(
-        "dadjokes",
-        {
-            "limit": 1,
-        },
-    )
+api_ninjas_dad_jokes = BatchFeed("dadjokes", ApiNinjas("dadjokes", {"limit": 10}).get)
 
-    message = ""
+
+@actions.add(weight=10, prefetch=True, aliases=["dadjoke"], timeout=ApiNinjas.deadline())
+async def action_apininjas_dad_joke():
     try:
-        res = api.get()
+        joke = await api_ninjas_dad_jokes.next()
     except RequestError as e:
-        return TextMessage(escape_markdown("\n".join(e.args)))
+        return ErrorMessage.from_error(e)
 
-    if res:
-        message = escape_markdown(res[0]["joke"])
+    return TextMessage(escape_markdown(joke["joke"]))
 
-    return TextMessage(message)
 
+api_ninjas_quotes = BatchFeed("quotes", ApiNinjas("quotes", {"limit": 10}).get)
 
-@actions.add(weight=4)
-def action_apininjas_quotes():
-    api = ApiNinjas(
-        "quotes",
-        {
-            "limit": 1,
-        },
-    )
 
-    message = ""
+@actions.add(weight=4, prefetch=True, aliases=["quote", "quotes"], timeout=ApiNinjas.deadline())
+async def action_apininjas_quotes():
     try:
-        res = api.get()
+        res = await api_ninjas_quotes.next()
     except RequestError as e:
-        return TextMessage(escape_markdown("\n".join(e.args)))
+        return ErrorMessage.from_error(e)
 
-    if res:
-        quote = escape_markdown(res[0]["quote"])
-        author = escape_markdown(res[0]["author"])
-        message = rf""""{quote}"
+    quote = escape_markdown(res["quote"])
+    author = escape_markdown(res["author"])
+    message = rf""""{quote}"
 \- _{author}_"""
 
     return TextMessage(message)
 
 
-@actions.add(weight=9)
-def action_apininjas_trivia():
-    api = ApiNinjas(
-        "trivia",
-        {
-            "limit": 1,
-        },
-    )
+api_ninjas_trivia = BatchFeed("trivia", ApiNinjas("trivia", {"limit": 30}).get)
 
-    message = ""
+
+@actions.add(weight=9, prefetch=True, aliases=["trivia"], timeout=ApiNinjas.deadline())
+async def action_apininjas_trivia():
     try:
-        res = api.get()
+        res = await api_ninjas_trivia.next()
     except RequestError as e:
-        return TextMessage(escape_markdown("\n".join(e.args)))
+        return ErrorMessage.from_error(e)
 
-    if res:
-        question = escape_markdown(res[0]["question"])
-        answer = escape_markdown(res[0]["answer"])
-        message = f"""{question}
+    question = escape_markdown(res["question"])
+    answer = escape_markdown(res["answer"])
+    message = f"""{question}
 
 ||{answer}||"""
 
     return TextMessage(message)
 
 
-@actions.add(weight=8)
-def action_apininjas_weather():
-    city = random.choice(list(geonamescache.GeonamesCache().get_cities().items()))[1]
+@actions.add(weight=8, prefetch=True, aliases=["weather"], timeout=ApiNinjas.deadline())
+async def action_apininjas_weather():
+    city = get_city_table().random()
     api = ApiNinjas(
         "weather",
         {
-            "lat": city["latitude"],
-            "lon": city["longitude"],
+            "lat": city.latitude,
+            "lon": city.longitude,
         },
     )
 
     message = ""
     try:
-        res = api.get()
+        res = await api.get()
     except RequestError as e:
-        message = escape_markdown("\n".join(e.args))
+        return ErrorMessage.from_error(e)
 
     if res:
         temperature = escape_markdown(str(res["temp"]))
-        city_name = escape_markdown(city["name"])
-        country_name = escape_markdown(city["countrycode"])
-        population = city["population"]
-        timezone = escape_markdown(city["timezone"])
+        city_name = escape_markdown(city.name)
+        country_name = escape_markdown(city.countrycode)
+        population = city.population
+        timezone = escape_markdown(city.timezone)
         message = f"""It's {temperature}°C in {city_name}/{country_name}
 Population: {population}
 Timezone: {timezone}"""
@@ -320,12 +555,29 @@ Timezone: {timezone}"""
     return TextMessage(message)
 
 
-# @actions.add(weight=10)
-def action_tim_imdb():
+def get_imdb_movie(movie_id: str, info_types: list[str]):
+    # cinemagoer scrapes imdb with blocking requests
+    c = Cinemagoer()
+    imdb_movie = c.get_movie(movie_id)
+    c.update(imdb_movie, info_types)
+    return imdb_movie
+
+
+async def get_tim_movies() -> Dict:
     url = os.getenv("TIM_API_URL") or "https://api.timhatdiehandandermaus.consulting"
-    url += "/movie?q="
-    response = requests.get(url)
-    js = response.json()
+    return await get_json_from_url(f"{url}/movie?q=")
+
+
+# the watched list only changes on movie nights
+tim_movies: RefreshingValue[Dict] = RefreshingValue("tim movies", get_tim_movies, 60 * 60)
+
+
+# @actions.add(weight=10, timeout=30)
+async def action_tim_imdb():
+    try:
+        js = await tim_movies.get()
+    except RequestError as e:
+        return ErrorMessage.from_error(e)
 
     info_types: list[str] = ["goofs", "trivia", "quotes"]
     api_movie = random.choice(
@@ -335,12 +587,10 @@ def action_tim_imdb():
             if movie["status"].lower() == "watched" or movie["imdb"]["title"] == "Airplane!"
         ]
     )
-    c = Cinemagoer()
-    imdb_movie = c.get_movie(api_movie["imdb"]["id"])
-    c.update(imdb_movie, info_types)
+    imdb_movie = await run_blocking(get_imdb_movie, api_movie["imdb"]["id"], info_types)
 
     if not any(info_type in imdb_movie.data.keys() for info_type in info_types):
-        return action_tim_imdb()
+        return await action_tim_imdb()
 
     random.shuffle(info_types)
     for info_type in info_types:
@@ -366,8 +616,8 @@ def action_tim_imdb():
     return TextMessage(text)
 
 
-@actions.add(weight=10, message_type=MessageType.Photo)
-def action_apininjas_cats():
+@actions.add(weight=10, message_type=MessageType.Photo, prefetch=True, timeout=ApiNinjas.deadline())
+async def action_apininjas_cats():
     MAX_OFFSET = (
         62  # experimentally checked that there are 82 available items and 20 items are returned by default
     )
@@ -382,9 +632,9 @@ def action_apininjas_cats():
     )
 
     try:
-        res = api.get()
+        res = await api.get()
     except RequestError as e:
-        return TextMessage(escape_markdown("\n".join(e.args)))
+        return ErrorMessage.from_error(e)
 
     if res:
         cat = random.choice(res)
@@ -393,55 +643,67 @@ def action_apininjas_cats():
         return PhotoMessage(url, caption)
 
 
-@actions.add(weight=10, message_type=MessageType.Photo)
-def action_the_cat_api():
-    api = TheCatApi("v1/images/search", {})
+# photo apis return many items per request, they're buffered and refilled in the background before running out
+the_cat_api_images = BatchFeed(
+    "thecatapi", TheCatApi("v1/images/search", {"limit": 10}).get, low_water=3, max_items=30
+)
+
 
+@actions.add(
+    weight=10, message_type=MessageType.Photo, prefetch=True, aliases=["cat"], timeout=TheCatApi.deadline()
+)
+async def action_the_cat_api():
     try:
-        res = api.get()
+        cat = await the_cat_api_images.next()
     except RequestError as e:
-        return TextMessage(escape_markdown("\n".join(e.args)))
+        return ErrorMessage.from_error(e)
 
-    if res:
-        cat = random.choice(res)
-        message = cat["url"]
-        return PhotoMessage(message)
+    return PhotoMessage(cat["url"])
 
 
-@actions.add(weight=10, message_type=MessageType.Photo)
-def action_nasa_apod():
+async def fetch_nasa_apod_images() -> List[Dict]:
     api = NasaApi(
         "/planetary/apod",
         {
-            "count": 1,
+            "count": 20,
         },
     )
 
+    res = await api.get()
+    # some days are videos, those can't be sent as a photo
+    return [image for image in res or [] if image.get("media_type", "image") == "image"]
+
+
+nasa_apod_images = BatchFeed("apod", fetch_nasa_apod_images, low_water=5, max_items=40)
+
+
+@actions.add(
+    weight=10, message_type=MessageType.Photo, prefetch=True, aliases=["apod"], timeout=NasaApi.deadline()
+)
+async def action_nasa_apod():
     try:
-        res = api.get()
+        image = await nasa_apod_images.next()
     except RequestError as e:
-        return TextMessage(escape_markdown("\n".join(e.args)))
+        return ErrorMessage.from_error(e)
 
-    if res:
-        image = res[0]
-        url = image.get("hdurl") or image.get("url")
-        caption = escape_markdown(
-            f"""{image["title"]} ({image['date']}):
+    url = image.get("hdurl") or image.get("url")
+    caption = escape_markdown(
+        f"""{image["title"]} ({image['date']}):
 
 {image["explanation"]}
 """
-        )
-        return PhotoMessage(url, caption)
+    )
+    return PhotoMessage(url, caption)
 
 
-@actions.add(weight=10, message_type=MessageType.Photo)
-def action_fox():
+@actions.add(weight=10, message_type=MessageType.Photo, prefetch=True)
+async def action_fox():
     url = "https://randomfox.ca/floof/"
 
     try:
-        res = get_json_from_url(url)
+        res = await get_json_from_url(url)
     except RequestError as e:
-        return TextMessage(escape_markdown("\n".join(e.args)))
+        return ErrorMessage.from_error(e)
 
     if res:
         return PhotoMessage(res["image"])
@@ -449,14 +711,14 @@ def action_fox():
     return None
 
 
-@actions.add(weight=10, message_type=MessageType.Photo)
-def action_dog_ceo():
+@actions.add(weight=10, message_type=MessageType.Photo, prefetch=True, aliases=["dog"])
+async def action_dog_ceo():
     url = "https://dog.ceo/api/breeds/image/random"
 
     try:
-        res = get_json_from_url(url)
+        res = await get_json_from_url(url)
     except RequestError as e:
-        return TextMessage(escape_markdown("\n".join(e.args)))
+        return ErrorMessage.from_error(e)
 
     if res:
         return PhotoMessage(res["message"])
@@ -464,61 +726,59 @@ def action_dog_ceo():
     return None
 
 
-@actions.add(weight=10, message_type=MessageType.Photo)
-def action_spacex():
-    url = "https://api.spacexdata.com/v5/launches/"
-
+@actions.add(weight=10, message_type=MessageType.Photo, prefetch=True)
+async def action_spacex():
     try:
-        res = get_json_from_url(url)
+        photo = await random_launch_photo()
     except RequestError as e:
-        return TextMessage(escape_markdown("\n".join(e.args)))
+        return ErrorMessage.from_error(e)
 
-    if res:
-        # this is fine, `/launches` always returns a list if successful
-        # noinspection PyTypeChecker
-        random.shuffle(res)
-        for launch in res:
-            links = launch["links"]["flickr"]["original"]
-            if not links:
-                continue
-
-            url = random.choice(links)
-            caption = launch.get("detail", "")
-            return PhotoMessage(url, caption)
+    if photo:
+        url, caption = photo
+        return PhotoMessage(url, caption)
 
     return None
 
 
-@actions.add(weight=10, message_type=MessageType.Photo)
+@actions.add(weight=10, message_type=MessageType.Photo, local=True)
 def action_beemovie():
+    return ChunkedTextMessage(chunks=beemovie_chunks())
+
+
+@cache
+def beemovie_chunks() -> tuple[str, ...]:
     from . import beemovie
 
-    return TextMessage(escape_markdown(beemovie.SCRIPT))
+    return tuple(TextMessage(escape_markdown(beemovie.SCRIPT)).split())
 
 
-@actions.add(weight=10, message_type=MessageType.Photo)
-def action_xkcd():
+@actions.add(weight=10, message_type=MessageType.Photo, prefetch=True)
+async def action_xkcd():
     from .xkcd import Xkcd
 
     try:
-        response = Xkcd().get_random()
+        comic = await Xkcd().get_random()
     except RequestError as e:
-        return TextMessage(escape_markdown("\n".join(e.args)))
+        return ErrorMessage.from_error(e)
 
-    if response.ok:
-        comic = response.json()
+    if comic:
         caption = escape_markdown(comic.get("alt", ""))
         return PhotoMessage(comic["img"], caption)
 
     return None
 
 
-@actions.add(weight=10, message_type=MessageType.Text)
-def action_station():
+# the first download of the station list includes parsing the whole page
+@actions.add(weight=10, message_type=MessageType.Text, prefetch=True, timeout=30)
+async def action_station():
     log = create_logger(inspect.currentframe().f_code.co_name)
 
-    station = random.choice(get_stations())
-    log.debug(f"{station.name}")
+    stations = await get_stations()
+    if not stations:
+        return None
+
+    station = random.choice(stations)
+    log.debug("%s", station.name)
 
     message = TextMessage(str(station))
     return message
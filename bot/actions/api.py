@@ -0,0 +1,90 @@
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional
+
+from . import http
+from .utils import get_json_from_url, RateLimitedError, TransientRequestError
+
+
+class ApiClient:
+    """
+    base for clients of json apis. subclasses set the `base_url` and how the api key is passed,
+    requests go through the shared http client with properly encoded query parameters.
+    transient failures (connection problems, server errors) are retried `retries` times
+    with exponential backoff. rate limited requests are only retried if the api says when,
+    and only if that's still within the client's `deadline`
+    """
+
+    base_url: str
+    # name of the environment variable holding the api key, it's read once per client class
+    api_key_env: Optional[str] = None
+    api_key_header: Optional[str] = None
+    api_key_param: Optional[str] = None
+    timeout: Optional[float] = None
+    retries: int = 1
+    retry_backoff: float = 0.5
+
+    _api_key: Optional[str] = None
+    _api_key_loaded: bool = False
+
+    def __init__(self, path: str, query_items: Dict = None):
+        self.path = path.lstrip("/")
+        self.query_items = dict(query_items or {})
+
+    @classmethod
+    def api_key(cls) -> Optional[str]:
+        if not cls.__dict__.get("_api_key_loaded"):
+            cls._api_key = os.getenv(cls.api_key_env) if cls.api_key_env else None
+            cls._api_key_loaded = True
+
+        return cls._api_key
+
+    @classmethod
+    def deadline(cls) -> float:
+        """
+        roughly how long `get` takes when every attempt times out,
+        actions using the client shouldn't give up earlier
+        """
+        attempt = cls.timeout if cls.timeout is not None else http.default_timeout()
+        backoff = sum(cls.retry_backoff * 2**retry for retry in range(cls.retries))
+        return (cls.retries + 1) * attempt + backoff
+
+    def url(self) -> str:
+        return f"{self.base_url}/{self.path}"
+
+    def params(self) -> Dict:
+        params = dict(self.query_items)
+        if self.api_key_param:
+            params[self.api_key_param] = self.api_key()
+
+        return {key: value for key, value in params.items() if value is not None}
+
+    def headers(self) -> Dict:
+        if self.api_key_header:
+            return {self.api_key_header: self.api_key()}
+
+        return {}
+
+    async def get(self) -> Optional[List | Dict]:
+        give_up_at = time.monotonic() + self.deadline()
+        attempt = 0
+        while True:
+            try:
+                return await get_json_from_url(
+                    self.url(), headers=self.headers(), params=self.params(), timeout=self.timeout
+                )
+            except RateLimitedError as e:
+                if attempt >= self.retries or e.retry_after is None:
+                    raise
+                if time.monotonic() + e.retry_after > give_up_at:
+                    raise
+
+                await asyncio.sleep(e.retry_after)
+                attempt += 1
+            except TransientRequestError:
+                if attempt >= self.retries:
+                    raise
+
+                await asyncio.sleep(self.retry_backoff * 2**attempt)
+                attempt += 1
@@ -0,0 +1,58 @@
+import time
+from enum import Enum
+
+
+class CircuitState(Enum):
+    Closed = "closed"
+    Open = "open"
+    HalfOpen = "half-open"
+
+
+class CircuitBreaker:
+    """
+    - closed: requests pass, `failure_threshold` consecutive failures open the circuit
+    - open: requests are rejected until `reset_timeout` seconds have passed
+    - half-open: a single probe request is let through, it closes the circuit on success and
+      opens it again on failure, everything else is rejected while the probe is in flight
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.Closed
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == CircuitState.Closed:
+            return True
+
+        if self.state == CircuitState.Open:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = CircuitState.HalfOpen
+
+        if self._probing:
+            return False
+
+        self._probing = True
+        return True
+
+    def success(self):
+        self.state = CircuitState.Closed
+        self.failures = 0
+        self._probing = False
+
+    def failure(self):
+        self.failures += 1
+        if self.state == CircuitState.HalfOpen or self.failures >= self.failure_threshold:
+            self.state = CircuitState.Open
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def abandon(self):
+        """
+        the request was cancelled before it produced a result, e.g. because of a timeout higher up
+        """
+        self._probing = False
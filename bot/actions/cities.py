@@ -0,0 +1,53 @@
+import random
+import sys
+from array import array
+from functools import cache
+from typing import NamedTuple
+
+import geonamescache
+
+
+class City(NamedTuple):
+    name: str
+    countrycode: str
+    latitude: float
+    longitude: float
+    population: int
+    timezone: str
+
+
+class CityTable:
+    """
+    column oriented copy of the few fields we need from geonamescache's city dict.
+    coordinates and populations live in flat arrays, country codes and timezones are interned
+    """
+
+    def __init__(self, cities: list[dict]):
+        self.names: tuple[str, ...] = tuple(city["name"] for city in cities)
+        self.countrycodes: tuple[str, ...] = tuple(sys.intern(city["countrycode"]) for city in cities)
+        self.timezones: tuple[str, ...] = tuple(sys.intern(city["timezone"]) for city in cities)
+        self.latitudes = array("d", (city["latitude"] for city in cities))
+        self.longitudes = array("d", (city["longitude"] for city in cities))
+        self.populations = array("q", (city["population"] for city in cities))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index: int) -> City:
+        return City(
+            name=self.names[index],
+            countrycode=self.countrycodes[index],
+            latitude=self.latitudes[index],
+            longitude=self.longitudes[index],
+            population=self.populations[index],
+            timezone=self.timezones[index],
+        )
+
+    def random(self) -> City:
+        return self[random.randrange(len(self))]
+
+
+@cache
+def get_city_table() -> CityTable:
+    # the full geonamescache dict (including alternate names) is dropped as soon as the table is built
+    return CityTable(list(geonamescache.GeonamesCache().get_cities().values()))
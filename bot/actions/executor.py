@@ -0,0 +1,38 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    thread pool for blocking work (synchronous actions, blocking libraries, parsing),
+    sized by `ACTION_WORKERS`
+    """
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("ACTION_WORKERS") or 4), thread_name_prefix="action"
+        )
+
+    return _executor
+
+
+async def run_blocking(f: Callable[..., T], *args, **kwargs) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(f, *args, **kwargs))
+
+
+def shutdown_executor():
+    global _executor
+
+    if _executor is not None:
+        # threads stuck in a hung upstream call are abandoned instead of blocking the shutdown
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,66 @@
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Generic, Optional, Sequence, TypeVar
+
+from .utils import RequestError
+from ..logger import create_logger
+
+T = TypeVar("T")
+
+
+class BatchFeed(Generic[T]):
+    """
+    hands out the items of batches returned by `fetch_batch` one at a time.
+
+    without a `low_water` mark a new batch is only fetched once every item of the previous one has been used,
+    otherwise the next batch is fetched in the background as soon as `low_water` or fewer items are left.
+    at most `max_items` are buffered, the oldest ones are dropped if a batch doesn't fit
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch_batch: Callable[[], Awaitable[Sequence[T]]],
+        low_water: int = 0,
+        max_items: int = None,
+    ):
+        self.name = name
+        self.fetch_batch = fetch_batch
+        self.low_water = low_water
+        self._items: deque[T] = deque(maxlen=max_items)
+        self._lock = asyncio.Lock()
+        self._refill: Optional[asyncio.Task] = None
+        self.log = create_logger(f"BatchFeed[{name}]")
+
+    async def _fill(self):
+        # concurrent callers wait for the same batch instead of fetching their own
+        async with self._lock:
+            if len(self._items) <= self.low_water:
+                self._items.extend(await self.fetch_batch() or [])
+
+    async def _fill_in_background(self):
+        try:
+            await self._fill()
+        except RequestError:
+            self.log.exception("failed to refill")
+
+    async def next(self) -> T:
+        if not self._items:
+            await self._fill()
+
+        try:
+            item = self._items.popleft()
+        except IndexError:
+            raise RequestError(f"{self.name} returned no items")
+
+        if (
+            self.low_water
+            and len(self._items) <= self.low_water
+            and (self._refill is None or self._refill.done())
+        ):
+            self._refill = asyncio.create_task(self._fill_in_background())
+
+        return item
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,79 @@
+import inspect
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from .utils import cache_dir
+from ..logger import create_logger
+
+
+class FileIdCache:
+    """
+    remembers the telegram `file_id` of photos that have been sent by their source url, so telegram
+    doesn't have to download them again. bounded to the `max_entries` most recently used urls
+    and written to disk at most every `save_interval` seconds (and on shutdown)
+    """
+
+    def __init__(self, path: Path, max_entries: int = 5000, save_interval: float = 60):
+        self.path = path
+        self.max_entries = max_entries
+        self.save_interval = save_interval
+        self._entries: Optional[OrderedDict[str, str]] = None
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def _load(self) -> OrderedDict[str, str]:
+        if self._entries is None:
+            try:
+                with self.path.open(encoding="utf-8") as f:
+                    self._entries = OrderedDict(json.load(f))
+            except (OSError, ValueError):
+                self._entries = OrderedDict()
+
+        return self._entries
+
+    def get(self, url: str) -> Optional[str]:
+        entries = self._load()
+        file_id = entries.get(url)
+        if file_id is not None:
+            entries.move_to_end(url)
+
+        return file_id
+
+    def put(self, url: str, file_id: str):
+        entries = self._load()
+        entries[url] = file_id
+        entries.move_to_end(url)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+        self._dirty = True
+        if time.monotonic() - self._saved_at > self.save_interval:
+            self.save()
+
+    def remove(self, url: str):
+        if self._load().pop(url, None) is not None:
+            self._dirty = True
+
+    def save(self):
+        log = create_logger(inspect.currentframe().f_code.co_name)
+
+        if not self._dirty:
+            return
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(list(self._entries.items()), f)
+            tmp.replace(self.path)
+            self._dirty = False
+        except OSError:
+            log.exception(f"failed to write {self.path}")
+
+        self._saved_at = time.monotonic()
+
+
+file_ids = FileIdCache(cache_dir() / "file_ids.json")
@@ -0,0 +1,99 @@
+import math
+import time
+from collections import deque
+from typing import Callable, Optional
+
+
+class ActionHealth:
+    """
+    rolling latency and error statistics of a single action.
+
+    `factor` scales the action's weight:
+    - every failure moves the error rate (an exponentially weighted average) up, every success down
+    - actions slower than `slow_after` seconds are weighted down proportionally
+    - `suspend_after` consecutive failures suspend the action (factor 0), the suspension doubles every
+      time it fails again right after being suspended, up to `max_suspension`
+    - after a suspension the error rate is still high, so the weight recovers gradually with every success
+
+    `on_change` is called whenever the factor changed noticeably, e.g. to rebuild a sampler.
+    the last `window` latencies are kept for percentiles
+    """
+
+    def __init__(
+        self,
+        on_change: Callable[[], None] = None,
+        alpha: float = 0.2,
+        slow_after: float = 3,
+        suspend_after: int = 3,
+        suspension: float = 30,
+        max_suspension: float = 600,
+        min_factor: float = 0.05,
+        step: float = 0.1,
+        window: int = 50,
+    ):
+        self.on_change = on_change
+        self.alpha = alpha
+        self.slow_after = slow_after
+        self.suspend_after = suspend_after
+        self.suspension = suspension
+        self.max_suspension = max_suspension
+        self.min_factor = min_factor
+        self.step = step
+
+        self.latency: Optional[float] = None
+        self._latencies: deque[float] = deque(maxlen=window)
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.suspended_until = 0.0
+        self._current_suspension = suspension
+        self._reported_factor = 1.0
+
+    def is_suspended(self, now: float = None) -> bool:
+        return (now or time.monotonic()) < self.suspended_until
+
+    def factor(self, now: float = None) -> float:
+        if self.is_suspended(now):
+            return 0.0
+
+        factor = 1 - self.error_rate
+        if self.latency and self.latency > self.slow_after:
+            factor *= self.slow_after / self.latency
+
+        return max(factor, self.min_factor)
+
+    def percentile(self, q: float, min_samples: int = 5) -> Optional[float]:
+        """
+        nearest-rank percentile (`q` between 0 and 1) of the recent latencies, `None` until there are enough
+        """
+        if len(self._latencies) < min_samples:
+            return None
+
+        latencies = sorted(self._latencies)
+        return latencies[max(math.ceil(q * len(latencies)) - 1, 0)]
+
+    def record(self, latency: float, ok: bool):
+        now = time.monotonic()
+        self._latencies.append(latency)
+        self.latency = (
+            latency if self.latency is None else self.alpha * latency + (1 - self.alpha) * self.latency
+        )
+        self.error_rate = self.alpha * (0 if ok else 1) + (1 - self.alpha) * self.error_rate
+
+        if ok:
+            self.consecutive_failures = 0
+            self._current_suspension = self.suspension
+        else:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.suspend_after and not self.is_suspended(now):
+                self.suspended_until = now + self._current_suspension
+                self._current_suspension = min(self._current_suspension * 2, self.max_suspension)
+                self.consecutive_failures = 0
+
+        self._notify(now)
+
+    def _notify(self, now: float):
+        factor = self.factor(now)
+        if abs(factor - self._reported_factor) >= self.step or (factor == 0) != (self._reported_factor == 0):
+            self._reported_factor = factor
+            if self.on_change:
+                self.on_change()
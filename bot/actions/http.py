@@ -0,0 +1,127 @@
+import asyncio
+import os
+from typing import Dict, Optional
+
+import httpx
+
+from .circuitbreaker import CircuitBreaker
+
+_client: Optional[httpx.AsyncClient] = None
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+class CircuitOpenError(httpx.HTTPError):
+    pass
+
+
+def _float_from_env(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _int_from_env(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def max_connections_per_host() -> int:
+    return _int_from_env("HTTP_MAX_CONNECTIONS_PER_HOST", 10)
+
+
+def default_timeout() -> float:
+    return _float_from_env("HTTP_TIMEOUT", 10.0)
+
+
+async def start_client() -> httpx.AsyncClient:
+    """
+    creates the shared connection pool, has to be called once from within the running event loop
+    """
+    global _client
+
+    if _client is not None:
+        return _client
+
+    timeout = httpx.Timeout(
+        default_timeout(),
+        connect=_float_from_env("HTTP_CONNECT_TIMEOUT", 5.0),
+    )
+    limits = httpx.Limits(
+        max_connections=_int_from_env("HTTP_MAX_CONNECTIONS", 100),
+        max_keepalive_connections=_int_from_env("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20),
+        keepalive_expiry=_float_from_env("HTTP_KEEPALIVE_EXPIRY", 30.0),
+    )
+    _client = httpx.AsyncClient(timeout=timeout, limits=limits, follow_redirects=True)
+
+    return _client
+
+
+async def stop_client():
+    global _client
+
+    if _client is None:
+        return
+
+    await _client.aclose()
+    _client = None
+    _host_limits.clear()
+    _breakers.clear()
+
+
+def get_client() -> httpx.AsyncClient:
+    if _client is None:
+        raise RuntimeError("the http client has not been started, call `start_client` first")
+
+    return _client
+
+
+def _host_limit(host: str) -> asyncio.Semaphore:
+    if host not in _host_limits:
+        _host_limits[host] = asyncio.Semaphore(max_connections_per_host())
+
+    return _host_limits[host]
+
+
+def circuit_breaker(host: str) -> CircuitBreaker:
+    if host not in _breakers:
+        _breakers[host] = CircuitBreaker(
+            failure_threshold=_int_from_env("HTTP_CIRCUIT_FAILURE_THRESHOLD", 5),
+            reset_timeout=_float_from_env("HTTP_CIRCUIT_RESET_TIMEOUT", 30.0),
+        )
+
+    return _breakers[host]
+
+
+async def request(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    sends a request through the shared client while respecting the per-host connection limit.
+    connection errors, timeouts and server errors count as failures of the host's circuit breaker,
+    while it is open requests fail immediately with a `CircuitOpenError`
+    """
+    client = get_client()
+    host = httpx.URL(url).host
+    breaker = circuit_breaker(host)
+
+    if not breaker.allow():
+        raise CircuitOpenError(f"{host} is unavailable, not sending any requests for now")
+
+    try:
+        async with _host_limit(host):
+            response = await client.request(method, url, **kwargs)
+    except httpx.TransportError:
+        breaker.failure()
+        raise
+    except BaseException:
+        breaker.abandon()
+        raise
+
+    if response.is_server_error:
+        breaker.failure()
+    else:
+        breaker.success()
+
+    return response
+
+
+async def get(url: str, **kwargs) -> httpx.Response:
+    return await request("GET", url, **kwargs)
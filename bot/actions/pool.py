@@ -0,0 +1,78 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from ..logger import create_logger
+
+T = TypeVar("T")
+
+
+def default_pool_size() -> int:
+    value = os.getenv("PREFETCH_SIZE")
+    return int(value) if value else 3
+
+
+class MessagePool(Generic[T]):
+    """
+    keeps up to `size` ready results of `produce` in memory.
+    a background task refills the pool whenever an item is taken out.
+    `produce` returning `None` counts as a failure, the task backs off before trying again
+    """
+
+    def __init__(
+        self,
+        name: str,
+        produce: Callable[[], Awaitable[Optional[T]]],
+        size: int,
+        max_backoff: float = 60,
+    ):
+        self.name = name
+        self.produce = produce
+        self.max_backoff = max_backoff
+        self._queue: asyncio.Queue[T] = asyncio.Queue(maxsize=size)
+        self._task: Optional[asyncio.Task] = None
+        self.log = create_logger(f"MessagePool[{name}]")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._fill(), name=f"prefetch-{self.name}")
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def get_nowait(self) -> Optional[T]:
+        try:
+            return self._queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    async def _fill(self):
+        backoff = 1.0
+        while True:
+            try:
+                item = await self.produce()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.log.exception("failed to prefetch")
+                item = None
+
+            if item is None:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            backoff = 1.0
+            # blocks while the pool is full, i.e. until an item has been used
+            await self._queue.put(item)
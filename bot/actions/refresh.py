@@ -0,0 +1,54 @@
+import asyncio
+import inspect
+import time
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from .utils import RequestError
+from ..logger import create_logger
+
+T = TypeVar("T")
+
+
+class RefreshingValue(Generic[T]):
+    """
+    an in-memory value that is loaded on first use and reloaded in the background once it's older
+    than `interval` seconds. the old value keeps being served while reloading and if reloading fails.
+
+    this is where concurrent fetches are coalesced: callers arriving before the first load finished wait
+    for it on the lock, and there is at most one background reload at a time
+    """
+
+    def __init__(self, name: str, load: Callable[[], Awaitable[T]], interval: float):
+        self.name = name
+        self.load = load
+        self.interval = interval
+        self.value: Optional[T] = None
+        self.loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh: Optional[asyncio.Task] = None
+
+    async def _reload(self) -> T:
+        value = await self.load()
+        self.value, self.loaded_at = value, time.monotonic()
+        return value
+
+    async def _reload_in_background(self):
+        log = create_logger(inspect.currentframe().f_code.co_name)
+
+        try:
+            await self._reload()
+        except RequestError:
+            log.exception(f"failed to refresh {self.name}")
+
+    async def get(self) -> T:
+        if self.value is None:
+            async with self._lock:
+                if self.value is None:
+                    return await self._reload()
+
+        if time.monotonic() - self.loaded_at > self.interval and (
+            self._refresh is None or self._refresh.done()
+        ):
+            self._refresh = asyncio.create_task(self._reload_in_background())
+
+        return self.value
@@ -0,0 +1,54 @@
+import random
+from typing import Generic, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class AliasSampler(Generic[T]):
+    """
+    weighted sampling in O(1) per draw using Vose's alias method,
+    building the tables is O(n) and has to be redone whenever the weights change
+    """
+
+    def __init__(self, items: Sequence[T], weights: Sequence[float]):
+        if len(items) != len(weights):
+            raise ValueError("`items` and `weights` must have the same length")
+
+        total = sum(weights)
+        if not items or total <= 0:
+            raise ValueError("at least one item needs a positive weight")
+
+        n = len(items)
+        self.items = tuple(items)
+        self._probability = [0.0] * n
+        self._alias = [0] * n
+
+        scaled = [weight * n / total for weight in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._probability[less] = scaled[less]
+            self._alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1
+            (small if scaled[more] < 1 else large).append(more)
+
+        # whatever is left over is 1 up to floating point errors
+        for i in small + large:
+            self._probability[i] = 1.0
+
+    def _draw(self, u: float) -> T:
+        # a single uniform number picks the column (integer part) and decides between it and its alias
+        scaled = u * len(self.items)
+        column = min(int(scaled), len(self.items) - 1)
+        if scaled - column < self._probability[column]:
+            return self.items[column]
+
+        return self.items[self._alias[column]]
+
+    def sample(self) -> T:
+        return self._draw(random.random())
+
+    def sample_many(self, k: int) -> List[T]:
+        return [self._draw(random.random()) for _ in range(k)]
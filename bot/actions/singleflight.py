@@ -0,0 +1,36 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    coalesces concurrent calls with the same key: the first caller starts `load`, everyone arriving
+    while it's in flight awaits the same task and gets the same result (or exception).
+    cancelling one of the callers doesn't cancel the shared task
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    def _done(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+        # the exception is delivered to the callers, this only prevents "exception was never retrieved"
+        # warnings when every caller has been cancelled in the meantime
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(load())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+
+        return await asyncio.shield(task)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
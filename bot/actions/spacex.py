@@ -0,0 +1,50 @@
+import random
+from typing import NamedTuple, Optional
+
+from .refresh import RefreshingValue
+from .utils import escape_markdown, post_json_to_url
+
+# https://github.com/r-spacex/SpaceX-API/blob/master/docs/queries.md
+QUERY_URL = "https://api.spacexdata.com/v5/launches/query"
+# only launches with at least one original flickr image, and only the fields we show
+QUERY = {
+    "query": {"links.flickr.original.0": {"$exists": True}},
+    "options": {
+        "select": {"name": 1, "details": 1, "links.flickr.original": 1},
+        "pagination": False,
+    },
+}
+# the api isn't updated anymore, so there is no need to check often
+REFRESH_INTERVAL = 24 * 60 * 60
+
+
+class LaunchPhotos(NamedTuple):
+    urls: tuple[str, ...]
+    caption: str
+
+
+async def load_launch_photos() -> tuple[LaunchPhotos, ...]:
+    res = await post_json_to_url(QUERY_URL, QUERY)
+
+    return tuple(
+        LaunchPhotos(
+            urls=tuple(launch["links"]["flickr"]["original"]),
+            caption=escape_markdown(launch.get("details") or launch.get("name") or ""),
+        )
+        for launch in res["docs"]
+        if launch["links"]["flickr"]["original"]
+    )
+
+
+_launch_photos: RefreshingValue[tuple[LaunchPhotos, ...]] = RefreshingValue(
+    "spacex launches", load_launch_photos, REFRESH_INTERVAL
+)
+
+
+async def random_launch_photo() -> Optional[tuple[str, str]]:
+    launches = await _launch_photos.get()
+    if not launches:
+        return None
+
+    launch = random.choice(launches)
+    return random.choice(launch.urls), launch.caption
@@ -1,13 +1,36 @@
+import asyncio
 import dataclasses
+import inspect
+import json
+import sys
+import time
 import unicodedata
 from enum import Enum
-from functools import lru_cache
 from typing import Optional, Self
 
-import requests
-from bs4 import BeautifulSoup, Tag
+import httpx
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 
 from bot import actions
+from . import http
+from .executor import run_blocking
+from .singleflight import SingleFlight
+from .utils import cache_dir, get_json_from_url, RequestError
+from ..logger import create_logger
+
+PAGE_TITLE = "Liste_der_Personenbahnhöfe_in_Schleswig-Holstein"
+PAGE_URL = "https://de.wikipedia.org/wiki/Liste_der_Personenbahnh%C3%B6fe_in_Schleswig-Holstein"
+API_URL = "https://de.wikipedia.org/w/api.php"
+# how often the page's revision id is compared against the cached one
+REVALIDATE_AFTER = 6 * 60 * 60
+# how long to wait before trying again after a failed revalidation (e.g. during a wikipedia outage)
+RETRY_AFTER = 15 * 60
+
+_stations: Optional[list["Station"]] = None
+_revision: Optional[int] = None
+_revalidate_at: float = 0
+_revalidation: Optional[asyncio.Task] = None
+_loading = SingleFlight()
 
 
 class StationType(Enum):
@@ -56,7 +79,7 @@ def format_routes(route_tag: Tag) -> str:
     return "\n".join(routes)
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Station:
     name: str
     name_link: str
@@ -69,23 +92,44 @@ class Station:
     transport_association: str
     category: str
     stop_type: StopType
-    route_tag: Tag
+    routes: str
     notes: str
-    _raw: str
 
     def __str__(self):
+        name, type_, town, district, opening, transport_association, category, stop_type, notes = (
+            actions.escape_markdown_many(
+                [
+                    self.name,
+                    str(self.type),
+                    self.town,
+                    self.district,
+                    self.opening,
+                    self.transport_association,
+                    self.category,
+                    str(self.stop_type),
+                    self.notes,
+                ]
+            )
+        )
         return rf"""
-Name: [{actions.escape_markdown(self.name)}]({self.name_link})
-Betriebsstelle: {actions.escape_markdown(str(self.type))}
+Name: [{name}]({self.name_link})
+Betriebsstelle: {type_}
 Gleise: {self.tracks}
-Stadt: [{actions.escape_markdown(self.town)}]({self.town_link})
-Kreis: {actions.escape_markdown(self.district)}
-Eröffnung: {actions.escape_markdown(self.opening)}
-Verkehrsverbund: {actions.escape_markdown(self.transport_association)}
-Kategorie: {actions.escape_markdown(self.category)}
-Halt\-Typ: {actions.escape_markdown(str(self.stop_type))}
-Strecke: {format_routes(self.route_tag)}
-Anmerkungen: {actions.escape_markdown(self.notes)}"""
+Stadt: [{town}]({self.town_link})
+Kreis: {district}
+Eröffnung: {opening}
+Verkehrsverbund: {transport_association}
+Kategorie: {category}
+Halt\-Typ: {stop_type}
+Strecke: {self.routes}
+Anmerkungen: {notes}"""
+
+    def to_json(self) -> dict:
+        return dataclasses.asdict(self) | {"type": self.type.name, "stop_type": self.stop_type.name}
+
+    @classmethod
+    def from_json(cls, data: dict) -> Self:
+        return cls(**data | {"type": StationType[data["type"]], "stop_type": StopType[data["stop_type"]]})
 
 
 def get_link(t: Tag) -> str:
@@ -101,21 +145,18 @@ def get_link(t: Tag) -> str:
 
 
 def normalize_column_strings(columns: list[Tag], unicode_form: str = "NFKD") -> list[str]:
-    return [unicodedata.normalize(unicode_form, " ".join(column.strings)) for column in columns]
+    # most columns (district, association, category, ...) repeat a handful of values
+    return [sys.intern(unicodedata.normalize(unicode_form, " ".join(column.strings))) for column in columns]
 
 
-@lru_cache()
-def get_stations() -> Optional[list[Station]]:
-    response = requests.get(
-        "https://de.wikipedia.org/wiki/Liste_der_Personenbahnh%C3%B6fe_in_Schleswig-Holstein"
-    )
-    if not response.ok:
-        return None
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    out = soup.find_all("table")
-    table = out[0]
-    body = table.find("tbody")
+def parse_stations(html: str, parser: str = "lxml") -> list[Station]:
+    """
+    only the tables of the page are parsed, every field is copied out as a plain string
+    and the tree is destroyed afterwards so none of it outlives this call
+    """
+    soup = BeautifulSoup(html, parser, parse_only=SoupStrainer("table"))
+    table = soup.find("table")
+    body = table.find("tbody") or table
     rows = body.find_all("tr")
 
     stations = []
@@ -136,11 +177,122 @@ def get_stations() -> Optional[list[Station]]:
             transport_association=column_strings[6],
             category=column_strings[7],
             stop_type=StopType.from_columns(column_strings[8], column_strings[9], column_strings[10]),
-            route_tag=columns[11],
+            routes=format_routes(columns[11]),
             notes=column_strings[12],
-            _raw=row,
         )
 
         stations.append(station)
 
+    soup.decompose()
+    return stations
+
+
+def _cache_file():
+    return cache_dir() / "stations.json"
+
+
+def load_cached_stations() -> Optional[tuple[int, list[Station]]]:
+    try:
+        with _cache_file().open(encoding="utf-8") as f:
+            cached = json.load(f)
+
+        return cached["revision"], [Station.from_json(station) for station in cached["stations"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def store_cached_stations(revision: int, stations: list[Station]):
+    log = create_logger(inspect.currentframe().f_code.co_name)
+
+    path = _cache_file()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"revision": revision, "stations": [station.to_json() for station in stations]}, f)
+        tmp.replace(path)
+    except OSError:
+        log.exception(f"failed to write {path}")
+
+
+async def get_revision() -> int:
+    res = await get_json_from_url(
+        f"{API_URL}?action=query&prop=revisions&rvprop=ids&format=json&formatversion=2&titles={PAGE_TITLE}"
+    )
+    try:
+        return res["query"]["pages"][0]["revisions"][0]["revid"]
+    except (KeyError, IndexError, TypeError):
+        raise RequestError(f"unexpected revision response: {res}")
+
+
+async def _download(revision: int) -> Optional[list[Station]]:
+    global _stations, _revision, _revalidate_at
+
+    log = create_logger(inspect.currentframe().f_code.co_name)
+
+    response = await http.get(PAGE_URL)
+    if not response.is_success:
+        log.warning(f"failed to download {PAGE_URL} [{response.status_code}]")
+        return None
+
+    stations = await run_blocking(parse_stations, response.text)
+    _stations, _revision, _revalidate_at = stations, revision, time.monotonic() + REVALIDATE_AFTER
+    await run_blocking(store_cached_stations, revision, stations)
+
     return stations
+
+
+async def _revalidate():
+    global _revalidate_at
+
+    log = create_logger(inspect.currentframe().f_code.co_name)
+
+    try:
+        revision = await get_revision()
+        if revision != _revision:
+            log.info(f"station page changed ({_revision} -> {revision})")
+            if await _download(revision) is not None:
+                return
+        else:
+            _revalidate_at = time.monotonic() + REVALIDATE_AFTER
+            return
+    except (RequestError, httpx.HTTPError):
+        log.exception("failed to revalidate stations")
+
+    # the cached stations are served until the next attempt
+    _revalidate_at = time.monotonic() + RETRY_AFTER
+
+
+def _schedule_revalidation():
+    global _revalidation
+
+    if _revalidation is None or _revalidation.done():
+        _revalidation = asyncio.create_task(_revalidate())
+
+
+async def get_stations() -> Optional[list[Station]]:
+    """
+    stations are served from memory or the on-disk cache and revalidated against the page's
+    current revision id in the background, the page is only downloaded and parsed if it changed
+    """
+    global _stations, _revision
+
+    if _stations is None:
+        cached = await run_blocking(load_cached_stations)
+        # another caller may have loaded the stations in the meantime
+        if cached and _stations is None:
+            _revision, _stations = cached
+
+    if _stations is not None:
+        if time.monotonic() >= _revalidate_at:
+            _schedule_revalidation()
+        return _stations
+
+    async def load():
+        return await _download(await get_revision())
+
+    try:
+        # everyone asking while nothing is cached waits for the same download
+        return await _loading.do(PAGE_URL, load)
+    except (RequestError, httpx.HTTPError):
+        return None
@@ -0,0 +1,44 @@
+from typing import Dict, Optional
+
+
+class _Node:
+    __slots__ = ("children", "target")
+
+    def __init__(self):
+        self.children: Dict[str, _Node] = {}
+        # the only target reachable from this node, `_AMBIGUOUS` if there's more than one
+        self.target: object = None
+
+
+_AMBIGUOUS = object()
+
+
+class PrefixTrie:
+    """
+    maps keys to target names and resolves a prefix to its target if the prefix is unambiguous,
+    i.e. all keys starting with it belong to the same target
+    """
+
+    def __init__(self):
+        self._root = _Node()
+
+    def insert(self, key: str, target: str):
+        node = self._root
+        for character in key:
+            node = node.children.setdefault(character, _Node())
+            if node.target is None:
+                node.target = target
+            elif node.target != target:
+                node.target = _AMBIGUOUS
+
+    def unique(self, prefix: str) -> Optional[str]:
+        node = self._root
+        for character in prefix:
+            node = node.children.get(character)
+            if node is None:
+                return None
+
+        if node is self._root or node.target is _AMBIGUOUS:
+            return None
+
+        return node.target
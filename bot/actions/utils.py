@@ -1,59 +1,142 @@
+import datetime
+import email.utils
 import inspect
-import socket
-from typing import Dict, Optional
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional
 
-import requests as requests
-import urllib3 as urllib3
+import httpx
 
+from . import http
 from ..logger import create_logger
 
+# `str.replace` is a C level scan per character which beats `str.translate` and `re.sub` for every input size,
+# skipping characters that don't occur avoids copying the string for them
+_MARKDOWN_ESCAPES = tuple((reserved, rf"\{reserved}") for reserved in "_*[]()~`>#+-=|{}.!")
+_BATCH_SEPARATOR = "\x00"
+
 
 def escape_markdown(text: str) -> str:
-    reserved_characters = [
-        "_",
-        "*",
-        "[",
-        "]",
-        "(",
-        ")",
-        "~",
-        "`",
-        ">",
-        "#",
-        "+",
-        "-",
-        "=",
-        "|",
-        "{",
-        "}",
-        ".",
-        "!",
-    ]
-    for reserved in reserved_characters:
-        text = text.replace(reserved, rf"\{reserved}")
+    for reserved, escaped in _MARKDOWN_ESCAPES:
+        if reserved in text:
+            text = text.replace(reserved, escaped)
 
     return text
 
 
+def escape_markdown_many(texts: Iterable[str]) -> list[str]:
+    """
+    escapes all texts at once by joining them, which saves the per-call overhead for many short fields
+    """
+    texts = list(texts)
+    joined = _BATCH_SEPARATOR.join(texts)
+    if joined.count(_BATCH_SEPARATOR) != len(texts) - 1:
+        return [escape_markdown(text) for text in texts]
+
+    return escape_markdown(joined).split(_BATCH_SEPARATOR)
+
+
+def cache_dir() -> Path:
+    """
+    directory for caches that should survive a restart, can be overwritten with `CACHE_DIR`
+    """
+    if path := os.getenv("CACHE_DIR"):
+        return Path(path)
+
+    return Path.home() / ".cache" / "random-action-bot"
+
+
 class RequestError(Exception):
     pass
 
 
-def get_json_from_url(url: str, *, headers: Dict = None) -> Optional[Dict]:
+class TransientRequestError(RequestError):
+    """
+    the request failed for a reason that might go away when retrying (connection problems, server errors)
+    """
+
+
+class RateLimitedError(RequestError):
+    """
+    the api answered with 429, retrying before `retry_after` seconds (if it said so) only uses up more quota
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max((date - datetime.datetime.now(datetime.timezone.utc)).total_seconds(), 0)
+
+
+def _request_options(headers: Optional[Dict], params: Optional[Dict], timeout: Optional[float]) -> Dict:
+    options = {}
+    if headers:
+        # unset headers (e.g. a missing api key) are left out like `requests` used to do
+        options["headers"] = {key: value for key, value in headers.items() if value is not None}
+    if params:
+        options["params"] = params
+    if timeout is not None:
+        options["timeout"] = timeout
+
+    return options
+
+
+async def _fetch_json(method: str, url: str, **options) -> Optional[Dict]:
     log = create_logger(inspect.currentframe().f_code.co_name)
 
     try:
-        response = requests.get(url, headers=headers)
-        content = response.json()
-    except (
-        requests.exceptions.ConnectionError,
-        socket.gaierror,
-        urllib3.exceptions.MaxRetryError,
-    ) as e:
-        log.exception("failed to communicate with jokes api")
-        raise RequestError(e)
-
-    if not response.ok:
+        response = await http.request(method, url, **options)
+    except http.CircuitOpenError as e:
+        log.warning(str(e))
+        raise RequestError(str(e))
+    except httpx.TransportError as e:
+        log.exception(f"failed to communicate with {url}")
+        raise TransientRequestError(str(e))
+    except httpx.HTTPError as e:
+        log.exception(f"failed to communicate with {url}")
+        raise RequestError(str(e))
+
+    if response.status_code == httpx.codes.TOO_MANY_REQUESTS:
+        raise RateLimitedError(f"[{response.status_code}]{response.text}", _retry_after(response))
+    if response.is_server_error:
+        raise TransientRequestError(f"[{response.status_code}]{response.text}")
+    if not response.is_success:
         raise RequestError(f"[{response.status_code}]{response.text}")
 
-    return content
+    try:
+        return response.json()
+    except ValueError as e:
+        log.exception(f"invalid json returned by {url}")
+        raise RequestError(str(e))
+
+
+async def get_json_from_url(
+    url: str,
+    *,
+    headers: Dict = None,
+    params: Dict = None,
+    timeout: float = None,
+) -> Optional[Dict]:
+    return await _fetch_json("GET", url, **_request_options(headers, params, timeout))
+
+
+async def post_json_to_url(
+    url: str, payload: Dict, *, headers: Dict = None, params: Dict = None, timeout: float = None
+) -> Optional[Dict]:
+    return await _fetch_json("POST", url, json=payload, **_request_options(headers, params, timeout))
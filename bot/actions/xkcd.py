@@ -1,28 +1,74 @@
+import inspect
+import json
 import random
+from pathlib import Path
+from typing import Dict, Optional
 
-import requests
-from requests import Response
+from .refresh import RefreshingValue
+from .utils import cache_dir, get_json_from_url
+from ..logger import create_logger
 
 
 class Xkcd:
     api_url = "https://xkcd.com"
     info_filename = "info.0.json"
+    # new comics are published three times a week
+    latest_interval = 60 * 60
 
-    def _get(self, path: str) -> Response:
+    async def _get(self, path: str) -> Dict:
         url = "/".join([self.api_url, path.lstrip("/")])
-        return requests.get(url)
+        return await get_json_from_url(url)
 
-    def get_number(self, number: int) -> Response:
-        return self._get("/".join([f"{number}", self.info_filename]))
+    @staticmethod
+    def _cache_file(number: int) -> Path:
+        return cache_dir() / "xkcd" / f"{number}.json"
 
-    def get_latest(self) -> Response:
-        return self._get(self.info_filename)
+    def _load_cached(self, number: int) -> Optional[Dict]:
+        try:
+            with self._cache_file(number).open(encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
 
-    def get_random(self) -> Response:
-        response = self.get_latest()
-        response.raise_for_status()
+    def _store_cached(self, comic: Dict):
+        log = create_logger(inspect.currentframe().f_code.co_name)
 
-        latest_info = response.json()
+        path = self._cache_file(comic["num"])
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("w", encoding="utf-8") as f:
+                json.dump(comic, f)
+        except OSError:
+            log.exception(f"failed to write {path}")
 
-        rand = random.randint(1, latest_info["num"])
-        return self.get_number(rand)
+    async def get_number(self, number: int) -> Dict:
+        # published comics don't change, so they're kept on disk forever
+        if comic := self._load_cached(number):
+            return comic
+
+        comic = await self._get("/".join([f"{number}", self.info_filename]))
+        self._store_cached(comic)
+        return comic
+
+    async def get_latest(self) -> Dict:
+        comic = await self._get(self.info_filename)
+        self._store_cached(comic)
+        return comic
+
+    async def _get_latest_number(self) -> int:
+        return (await self.get_latest())["num"]
+
+    async def get_random(self) -> Dict:
+        latest = await _latest_number.get()
+
+        rand = random.randint(1, latest)
+        while rand == 404:
+            # https://xkcd.com/404 doesn't exist (on purpose)
+            rand = random.randint(1, latest)
+
+        return await self.get_number(rand)
+
+
+_latest_number: RefreshingValue[int] = RefreshingValue(
+    "latest xkcd", Xkcd()._get_latest_number, Xkcd.latest_interval
+)
@@ -1,19 +1,63 @@
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
+import sys
+from functools import cache
+from typing import Optional
 
 
-def create_logger(name: str, level: int = logging.DEBUG) -> logging.Logger:
-    import sys
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """
+    the stock `prepare` formats the record (including tracebacks) in the caller so it could be pickled,
+    the queue never leaves the process, so the record is passed on as is and formatted by the listener
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+
+def default_level() -> int:
+    """
+    `LOG_LEVEL` as a level name (e.g. `INFO`) or number, defaults to `DEBUG`
+    """
+    value = (os.getenv("LOG_LEVEL") or "DEBUG").upper()
+    return int(value) if value.isdigit() else logging.getLevelNamesMapping()[value]
 
-    logger = logging.Logger(name)
-    ch = logging.StreamHandler(sys.stdout)
 
-    formatting = "[{}] %(asctime)s\t%(levelname)s\t%(module)s.%(funcName)s#%(lineno)d | %(message)s".format(
-        name
-    )
-    formatter = logging.Formatter(formatting)
-    ch.setFormatter(formatter)
+def _get_queue_handler() -> logging.handlers.QueueHandler:
+    """
+    loggers only put records on a queue, formatting and writing to stdout happens on the listener's thread
+    """
+    global _listener, _queue_handler
 
-    logger.addHandler(ch)
-    logger.setLevel(level)
+    if _queue_handler is None:
+        records = queue.SimpleQueue()
+        ch = logging.StreamHandler(sys.stdout)
+        ch.setFormatter(
+            logging.Formatter(
+                "[%(name)s] %(asctime)s\t%(levelname)s\t%(module)s.%(funcName)s#%(lineno)d | %(message)s"
+            )
+        )
+
+        _queue_handler = _InProcessQueueHandler(records)
+        _listener = logging.handlers.QueueListener(records, ch)
+        _listener.start()
+        # flushes whatever is still queued
+        atexit.register(_listener.stop)
+
+    return _queue_handler
+
+
+@cache
+def create_logger(name: str, level: int = None) -> logging.Logger:
+    logger = logging.Logger(name)
+    logger.addHandler(_get_queue_handler())
+    logger.setLevel(level if level is not None else default_level())
 
     return logger
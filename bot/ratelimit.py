@@ -0,0 +1,136 @@
+import asyncio
+import time
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Union
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from .logger import create_logger
+
+JSONDict = Dict[str, Any]
+
+
+class TokenBucket:
+    """
+    classic token bucket, `acquire` waits (asynchronously) until a token is available.
+    waiters are served in the order they arrived
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def is_full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.capacity and not self._lock.locked()
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+
+            self.tokens -= 1
+
+
+class TokenBucketRateLimiter(BaseRateLimiter[None]):
+    """
+    enforces telegram's limits (https://core.telegram.org/bots/faq#my-bot-is-hitting-limits-how-do-i-avoid-this)
+    for every request that targets a chat:
+    - ~30 messages per second overall
+    - ~1 message per second per chat
+    - ~20 messages per minute per group
+
+    a chat that is waiting for its bucket does not block requests for any other chat
+    """
+
+    def __init__(
+        self,
+        overall_rate: float = 30,
+        chat_rate: float = 1,
+        group_rate: float = 20 / 60,
+        group_capacity: float = 20,
+        max_retries: int = 1,
+        max_idle_buckets: int = 1024,
+    ):
+        self.overall_bucket = TokenBucket(overall_rate, overall_rate)
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.group_capacity = group_capacity
+        self.max_retries = max_retries
+        self.max_idle_buckets = max_idle_buckets
+        self._chat_buckets: Dict[Union[str, int], TokenBucket] = {}
+        self._group_buckets: Dict[Union[str, int], TokenBucket] = {}
+        self.log = create_logger("TokenBucketRateLimiter")
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        self._chat_buckets.clear()
+        self._group_buckets.clear()
+
+    def _bucket(
+        self, buckets: Dict[Union[str, int], TokenBucket], key: Union[str, int], rate: float, capacity: float
+    ) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is not None:
+            return bucket
+
+        if len(buckets) >= self.max_idle_buckets:
+            # a full bucket behaves exactly like a freshly created one, so it's safe to drop it
+            for idle_key in [k for k, b in buckets.items() if b.is_full()]:
+                del buckets[idle_key]
+
+        bucket = TokenBucket(rate, capacity)
+        buckets[key] = bucket
+        return bucket
+
+    @staticmethod
+    def _is_group(chat_id: Union[str, int]) -> bool:
+        if isinstance(chat_id, str):
+            return chat_id.startswith("@") or chat_id.startswith("-")
+
+        return chat_id < 0
+
+    async def _acquire(self, chat_id: Union[str, int]):
+        # the overall bucket is acquired last so a chat waiting for its own bucket doesn't use up overall capacity
+        await self._bucket(self._chat_buckets, chat_id, self.chat_rate, 1).acquire()
+        if self._is_group(chat_id):
+            await self._bucket(self._group_buckets, chat_id, self.group_rate, self.group_capacity).acquire()
+        await self.overall_bucket.acquire()
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Union[bool, JSONDict, List[JSONDict]]]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[None],
+    ) -> Union[bool, JSONDict, List[JSONDict]]:
+        chat_id = data.get("chat_id")
+
+        retries = 0
+        while True:
+            if chat_id is not None:
+                await self._acquire(chat_id)
+
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                if retries >= self.max_retries:
+                    raise
+
+                retries += 1
+                self.log.warning(f"`{endpoint}` hit the flood limit, retrying in {e.retry_after}s")
+                await asyncio.sleep(e.retry_after)
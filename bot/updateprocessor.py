@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any, Awaitable, Dict, Hashable, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """
+    processes updates of different chats concurrently (at most `max_concurrent_updates` at a time),
+    while updates of the same chat are still processed one after another in the order they arrived.
+
+    the semaphore of `BaseUpdateProcessor` is acquired before `do_process_update` is called, so it
+    only bounds the number of accepted updates (`max_pending_updates`). the actual concurrency limit
+    is applied after the chat's lock, so updates waiting for a busy chat don't block other chats
+    """
+
+    def __init__(self, max_concurrent_updates: int = 32, max_pending_updates: int = 1024):
+        super().__init__(max_pending_updates)
+        self._concurrency = asyncio.Semaphore(max_concurrent_updates)
+        # chat id -> (lock, number of updates holding or waiting for it)
+        self._chat_locks: Dict[Hashable, tuple[asyncio.Lock, int]] = {}
+
+    @staticmethod
+    def _chat_id(update: object) -> Optional[Hashable]:
+        if isinstance(update, Update) and update.effective_chat:
+            return update.effective_chat.id
+
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        chat_id = self._chat_id(update)
+        if chat_id is None:
+            async with self._concurrency:
+                await coroutine
+            return
+
+        lock, users = self._chat_locks.get(chat_id, (asyncio.Lock(), 0))
+        self._chat_locks[chat_id] = (lock, users + 1)
+        try:
+            # asyncio.Lock is fair, so updates of a chat are processed in the order they arrived
+            async with lock:
+                async with self._concurrency:
+                    await coroutine
+        finally:
+            lock, users = self._chat_locks[chat_id]
+            if users == 1:
+                del self._chat_locks[chat_id]
+            else:
+                self._chat_locks[chat_id] = (lock, users - 1)
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
@@ -1,12 +1,15 @@
 import inspect
 import os
 import sys
+from urllib.parse import urlsplit
 
 import telegram.ext
-from telegram.ext import ApplicationBuilder
+from telegram.ext import Application, ApplicationBuilder
 
 import bot
 from bot.logger import create_logger
+from bot.ratelimit import TokenBucketRateLimiter
+from bot.updateprocessor import PerChatUpdateProcessor
 
 
 def get_bot_token_or_die(env_variable: str = "BOT_TOKEN"):
@@ -18,9 +21,36 @@ def get_bot_token_or_die(env_variable: str = "BOT_TOKEN"):
     sys.exit(1)
 
 
+def run_webhook(application: Application, webhook_url: str):
+    """
+    receives updates on an embedded http server instead of polling for them.
+    requests without the matching `X-Telegram-Bot-Api-Secret-Token` header are rejected
+    """
+    secret_token = get_bot_token_or_die("WEBHOOK_SECRET_TOKEN")
+
+    application.run_webhook(
+        listen=os.getenv("WEBHOOK_LISTEN") or "0.0.0.0",
+        port=int(os.getenv("WEBHOOK_PORT") or 8080),
+        url_path=urlsplit(webhook_url).path.lstrip("/"),
+        webhook_url=webhook_url,
+        secret_token=secret_token,
+    )
+
+
 def main():
     bot_token = get_bot_token_or_die()
-    application = ApplicationBuilder().token(bot_token).build()
+    builder = (
+        ApplicationBuilder()
+        .token(bot_token)
+        .rate_limiter(TokenBucketRateLimiter())
+        .concurrent_updates(PerChatUpdateProcessor(int(os.getenv("MAX_CONCURRENT_UPDATES") or 32)))
+        .post_init(bot.startup)
+        .post_shutdown(bot.shutdown)
+    )
+    # allows pointing the bot at a local stub of the bot api (see `scripts/webhook_stub.py`)
+    if base_url := os.getenv("TELEGRAM_BASE_URL"):
+        builder = builder.base_url(base_url)
+    application = builder.build()
 
     weights_handler = telegram.ext.CommandHandler("weights", bot.weights)
     application.add_handler(weights_handler)
@@ -28,7 +58,10 @@ def main():
     random_handler = telegram.ext.MessageHandler(telegram.ext.filters.ALL, bot.random_action)
     application.add_handler(random_handler)
 
-    application.run_polling()
+    if webhook_url := os.getenv("WEBHOOK_URL"):
+        run_webhook(application, webhook_url)
+    else:
+        application.run_polling()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,88 @@
+"""
+exercises webhook mode locally without telegram:
+- serves a minimal stub of the bot api that answers every method and prints what the bot sends
+- POSTs a command update to the bot's webhook with the right secret token and one with a wrong one
+
+usage:
+    BOT_TOKEN=123:stub TELEGRAM_BASE_URL=http://127.0.0.1:8081/bot \\
+        WEBHOOK_URL=http://127.0.0.1:8080/telegram WEBHOOK_SECRET_TOKEN=local-secret python main.py
+    python scripts/webhook_stub.py [--webhook-url http://127.0.0.1:8080/telegram] [--secret-token local-secret]
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BOT = {"id": 123, "is_bot": True, "first_name": "stub", "username": "stub_bot"}
+CHAT = {"id": 1, "type": "private", "first_name": "tester"}
+USER = {"id": 1, "is_bot": False, "first_name": "tester"}
+
+
+def fake_message(text: str, message_id: int = 1) -> dict:
+    return {"message_id": message_id, "date": int(time.time()), "chat": CHAT, "from": USER, "text": text}
+
+
+class BotApiStub(BaseHTTPRequestHandler):
+    def do_POST(self):
+        method = self.path.rsplit("/", 1)[-1]
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        print(f"bot api <- {method} {body[:200]!r}")
+
+        if method == "getMe":
+            result = BOT
+        elif method.startswith("send"):
+            result = fake_message("", message_id=2) | {"from": BOT}
+        else:
+            result = True
+
+        response = json.dumps({"ok": True, "result": result}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+def post_update(webhook_url: str, secret_token: str, update_id: int, text: str) -> int:
+    update = {"update_id": update_id, "message": fake_message(text)}
+    request = urllib.request.Request(
+        webhook_url,
+        data=json.dumps(update).encode(),
+        headers={"Content-Type": "application/json", "X-Telegram-Bot-Api-Secret-Token": secret_token},
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--listen-port", type=int, default=8081)
+    parser.add_argument("--webhook-url", default="http://127.0.0.1:8080/telegram")
+    parser.add_argument("--secret-token", default="local-secret")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.listen_port), BotApiStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"bot api stub listening on 127.0.0.1:{args.listen_port}, start the bot now")
+
+    while True:
+        try:
+            input("press enter to send updates ")
+        except EOFError:
+            break
+        print("valid secret:", post_update(args.webhook_url, args.secret_token, 1, "/random_phrase"))
+        print("wrong secret:", post_update(args.webhook_url, "wrong", 2, "/random_phrase"))
+
+
+if __name__ == "__main__":
+    main()